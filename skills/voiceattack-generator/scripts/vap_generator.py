@@ -21,12 +21,18 @@ import json
 import math
 import os
 import sys
-import uuid
-from xml.sax.saxutils import escape
+import tempfile
 
 # Track warnings for summary
 _warnings = []
 
+# Rendered-action memo: logical content -> template parts (see action_xml)
+_action_cache = {}
+
+# Pre-rendered KeyCodes rows for the byte-range VK codes every named key uses;
+# raw numeric codes outside 0..255 fall back to formatting inline.
+_VK_XML = tuple(f"            <unsignedShort>{i}</unsignedShort>" for i in range(256))
+
 
 def warn(msg):
     """Print warning to stderr and track it."""
@@ -34,6 +40,21 @@ def warn(msg):
     print(f"WARNING: {msg}", file=sys.stderr)
 
 
+# XML escape map, same three entities saxutils.escape substitutes (quotes are
+# deliberately left alone - all escaped values land in element content).
+_ESC_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def _escape(s):
+    """Escape only when the string actually contains markup characters - the
+    overwhelming majority of triggers, categories and names are clean, and the
+    guard skips the translate pass (and its copy) for them. str.translate is
+    one C pass over the string vs saxutils.escape's three replace passes."""
+    if "&" in s or "<" in s or ">" in s:
+        return s.translate(_ESC_TABLE)
+    return s
+
+
 # Windows Virtual Key Codes
 KEY_CODES = {
     # Letters
@@ -230,6 +251,9 @@ MOUSE_CODES = {
     "triple_click": "LTC",  # default to left
 }
 
+# Scroll context codes (scroll actions carry clicks in Duration/X, not seconds).
+_SCROLL_CODES = frozenset(("SF", "SB", "SL", "SR"))
+
 
 # Condition block action types (JSON "type" -> XML ActionType string). Codes 19/63/29/20
 # per schema/vap_capability_dictionary.json 0.2.0 action_types (confirmed against real
@@ -288,8 +312,27 @@ class ConditionValidationError(Exception):
     index and produce an importable-but-broken profile."""
 
 
+# new_guid runs once per command plus once per action; uuid.uuid4() costs an
+# os.urandom syscall and a UUID object each call. Pool the randomness instead:
+# one 16 KiB urandom read covers 1024 GUIDs, and the version/variant bits plus
+# hex formatting reproduce the canonical RFC 4122 v4 form uuid4 would print.
+_GUID_POOL_SIZE = 16 * 1024
+_guid_pool = b""
+_guid_pool_off = 0
+
+
 def new_guid():
-    return str(uuid.uuid4())
+    global _guid_pool, _guid_pool_off
+    off = _guid_pool_off
+    if off >= len(_guid_pool):
+        _guid_pool = os.urandom(_GUID_POOL_SIZE)
+        off = 0
+    raw = bytearray(_guid_pool[off:off + 16])
+    _guid_pool_off = off + 16
+    raw[6] = (raw[6] & 0x0F) | 0x40  # version 4
+    raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 def format_duration(value):
@@ -313,6 +356,44 @@ def format_duration(value):
     return s
 
 
+# Constant template text is split once at import (at the \x00 sentinels); the
+# renderers then join constant parts with per-call values, instead of pushing
+# ~1.4 KB of unchanged literal bytes through f-string BUILD_STRING per action.
+_ACTION_PARTS = """        <CommandAction>
+          <PairingSet>false</PairingSet>
+          <PairingSetElse>false</PairingSetElse>
+          <Ordinal>\x00</Ordinal>
+          <ConditionMet xsi:nil="true"/>
+          <IndentLevel>\x00</IndentLevel>
+          <ConditionSkip>false</ConditionSkip>
+          <IsSuffixAction>false</IsSuffixAction>
+          <DecimalTransient1>0</DecimalTransient1>
+          <Id>\x00</Id>
+          <ActionType>\x00</ActionType>
+          <Duration>\x00</Duration>
+          <Delay>\x00</Delay>
+          \x00
+          <Context>\x00</Context>
+          <X>\x00</X>
+          <Y>\x00</Y>
+          <Z>\x00</Z>
+          <InputMode>0</InputMode>
+          <ConditionPairing>\x00</ConditionPairing>
+          <ConditionGroup>\x00</ConditionGroup>
+          <ConditionStartOperator>0</ConditionStartOperator>
+          <ConditionStartValue>0</ConditionStartValue>
+          <ConditionStartValueType>0</ConditionStartValueType>
+          <ConditionStartType>0</ConditionStartType>
+          <DecimalContext1>\x00</DecimalContext1>
+          <DecimalContext2>0</DecimalContext2>
+          <DateContext1>0001-01-01T00:00:00</DateContext1>
+          <DateContext2>0001-01-01T00:00:00</DateContext2>
+          <Disabled>false</Disabled>
+          <RandomSounds/>
+          <ConditionExpressions/>
+        </CommandAction>""".split("\x00")
+
+
 def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition_group=0):
     """Generate XML for a single action. Returns None if the action should
     be skipped entirely (unknown action type or unknown mouse action).
@@ -324,6 +405,21 @@ def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition
     if action_type in CONDITION_ACTION_TYPES:
         return _condition_action_xml(action, ordinal, indent_level, condition_pairing, condition_group)
 
+    # Identical action definitions recur heavily in real profiles (hundreds of
+    # "press key X for 0.1s"), so rendered actions are memoized on their logical
+    # content; only the Ordinal and Id slots differ per use. Renders that emitted
+    # a warning are never cached - repeats must keep warning - and SetDecimal
+    # returns early below, so it simply never populates the cache.
+    try:
+        cache_key = (json.dumps(action, sort_keys=True), indent_level,
+                     condition_pairing, condition_group)
+    except (TypeError, ValueError):
+        cache_key = None
+    cached = _action_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        return cached[0] + str(ordinal) + cached[1] + new_guid() + cached[2]
+    warnings_at_entry = len(_warnings)
+
     # Common fields
     action_id = new_guid()
     duration = action.get("duration", 0.1 if action_type == "PressKey" else 0)
@@ -339,14 +435,21 @@ def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition
         if isinstance(keys, str):
             keys = [keys]
         codes = []
+        kc_get = KEY_CODES.get
         for k in keys:
             if isinstance(k, int) and not isinstance(k, bool):
                 # Raw VK code given as a JSON number - accept as-is
                 codes.append(k)
                 continue
-            k_lower = k.lower()
-            if k_lower in KEY_CODES:
-                codes.append(KEY_CODES[k_lower])
+            # Single probe: get() with a None sentinel instead of `in` + index
+            # (no key maps to a falsy code, so None is unambiguous). Dictionary
+            # keys are all lowercase, so already-lowercase names - the common
+            # case - hit on the first probe and skip the .lower() copy.
+            code = kc_get(k)
+            if code is None:
+                code = kc_get(k.lower())
+            if code is not None:
+                codes.append(code)
             elif k.isdigit():
                 codes.append(int(k))
             else:
@@ -354,19 +457,27 @@ def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition
         if codes:
             key_codes_xml = (
                 "<KeyCodes>\n"
-                + "\n".join(
-                    f"            <unsignedShort>{c}</unsignedShort>" for c in codes
-                )
+                + "\n".join([
+                    _VK_XML[c] if 0 <= c < 256
+                    else f"            <unsignedShort>{c}</unsignedShort>"
+                    for c in codes
+                ])
                 + "\n          </KeyCodes>"
             )
 
     elif action_type == "MouseAction":
-        mouse_action = action.get("action", "left_click").lower()
-        if mouse_action not in MOUSE_CODES:
+        mouse_action = action.get("action", "left_click")
+        context = MOUSE_CODES.get(mouse_action)
+        if context is None:
+            # MOUSE_CODES keys are lowercase; retry lowered only on a miss so
+            # already-lowercase names skip the copy. Lower before warning so
+            # the message reads the same as it always has.
+            mouse_action = mouse_action.lower()
+            context = MOUSE_CODES.get(mouse_action)
+        if context is None:
             warn(f"Unknown mouse action '{mouse_action}' - skipped")
             return None
-        context = MOUSE_CODES[mouse_action]
-        if context in ("SF", "SB", "SL", "SR"):
+        if context in _SCROLL_CODES:
             # scroll_clicks for scroll actions - try Duration field (appears before Context)
             scroll_clicks = action.get("scroll_clicks", 1)
             duration = scroll_clicks  # Try Duration for scroll clicks
@@ -382,7 +493,7 @@ def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition
         duration = action.get("duration", 0.5)
 
     elif action_type == "Say":
-        context = escape(action.get("text", ""))
+        context = _escape(action.get("text", ""))
         x = action.get("volume", 100)
         y = action.get("rate", 0)
 
@@ -396,7 +507,7 @@ def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition
         # not keystrokes. Text in Context, X = color code (mapping unverified - emit 0).
         # Shape validated in _validate_actions (hard-fail).
         action_type = "WriteToLog"
-        context = escape(action.get("text", ""))
+        context = _escape(action.get("text", ""))
 
     else:
         warn(f"Unknown action type '{action_type}' - skipped")
@@ -408,39 +519,22 @@ def action_xml(action, ordinal=0, indent_level=0, condition_pairing=0, condition
         skip_duration_validation = True
     duration_str = str(duration) if skip_duration_validation else format_duration(duration)
 
-    return f"""        <CommandAction>
-          <PairingSet>false</PairingSet>
-          <PairingSetElse>false</PairingSetElse>
-          <Ordinal>{ordinal}</Ordinal>
-          <ConditionMet xsi:nil="true"/>
-          <IndentLevel>{indent_level}</IndentLevel>
-          <ConditionSkip>false</ConditionSkip>
-          <IsSuffixAction>false</IsSuffixAction>
-          <DecimalTransient1>0</DecimalTransient1>
-          <Id>{action_id}</Id>
-          <ActionType>{action_type}</ActionType>
-          <Duration>{duration_str}</Duration>
-          <Delay>{delay}</Delay>
-          {key_codes_xml}
-          <Context>{context}</Context>
-          <X>{x}</X>
-          <Y>{y}</Y>
-          <Z>{z}</Z>
-          <InputMode>0</InputMode>
-          <ConditionPairing>{condition_pairing}</ConditionPairing>
-          <ConditionGroup>{condition_group}</ConditionGroup>
-          <ConditionStartOperator>0</ConditionStartOperator>
-          <ConditionStartValue>0</ConditionStartValue>
-          <ConditionStartValueType>0</ConditionStartValueType>
-          <ConditionStartType>0</ConditionStartType>
-          <DecimalContext1>{scroll_clicks}</DecimalContext1>
-          <DecimalContext2>0</DecimalContext2>
-          <DateContext1>0001-01-01T00:00:00</DateContext1>
-          <DateContext2>0001-01-01T00:00:00</DateContext2>
-          <Disabled>false</Disabled>
-          <RandomSounds/>
-          <ConditionExpressions/>
-        </CommandAction>"""
+    p = _ACTION_PARTS
+    rendered = "".join((
+        p[0], str(ordinal), p[1], str(indent_level), p[2], action_id,
+        p[3], action_type, p[4], duration_str, p[5], str(delay),
+        p[6], key_codes_xml, p[7], context, p[8], str(x), p[9], str(y),
+        p[10], str(z), p[11], str(condition_pairing), p[12], str(condition_group),
+        p[13], str(scroll_clicks), p[14],
+    ))
+    if cache_key is not None and len(_warnings) == warnings_at_entry:
+        # Split at the two per-use slots; escaped content cannot contain '<', so
+        # the full elements are unambiguous split points.
+        template = rendered.replace(
+            f"<Ordinal>{ordinal}</Ordinal>", "<Ordinal>\x00</Ordinal>", 1
+        ).replace(f"<Id>{action_id}</Id>", "<Id>\x00</Id>", 1)
+        _action_cache[cache_key] = tuple(template.split("\x00"))
+    return rendered
 
 
 def _condition_action_xml(action, ordinal, indent_level, condition_pairing, condition_group):
@@ -457,8 +551,8 @@ def _condition_action_xml(action, ordinal, indent_level, condition_pairing, cond
     if action_type in (CONDITION_OPEN, "ElseIf"):
         condition = action["condition"]  # presence already validated
         operator_code = TEXT_OPERATORS[condition["operator"]]
-        left_operand = escape(condition["leftOperand"])
-        value = escape(str(condition["value"]))
+        left_operand = _escape(condition["leftOperand"])
+        value = _escape(str(condition["value"]))
         return f"""        <CommandAction>
           <PairingSet>false</PairingSet>
           <PairingSetElse>false</PairingSetElse>
@@ -550,7 +644,7 @@ def _decimal_set_xml(action, ordinal, indent_level):
     Mandiant-generation serializer this generator's template already follows. Pending
     the VoiceAttack import probe."""
     action_id = new_guid()
-    variable = escape(action["variable"])  # shape validated in _validate_actions
+    variable = _escape(action["variable"])  # shape validated in _validate_actions
     value = _format_decimal(action["value"])
     return f"""        <CommandAction>
           <PairingSet>false</PairingSet>
@@ -675,13 +769,94 @@ def _validate_actions(actions, trigger_raw):
         fail(f"{len(stack)} condition block(s) opened with 'BeginCondition' but never closed with 'EndCondition'")
 
 
+_COMMAND_PARTS = """    <Command>
+      <Referrer xsi:nil="true"/>
+      <ExecType>3</ExecType>
+      <Confidence>0</Confidence>
+      <PrefixActionCount>0</PrefixActionCount>
+      <IsDynamicallyCreated>false</IsDynamicallyCreated>
+      <TargetProcessSet>false</TargetProcessSet>
+      <TargetProcessType>0</TargetProcessType>
+      <TargetProcessLevel>0</TargetProcessLevel>
+      <CompareType>0</CompareType>
+      <ExecFromWildcard>false</ExecFromWildcard>
+      <IsSubCommand>false</IsSubCommand>
+      <IsOverride>false</IsOverride>
+      <BaseId>\x00</BaseId>
+      <OriginId>00000000-0000-0000-0000-000000000000</OriginId>
+      <SessionEnabled>true</SessionEnabled>
+      <Id>\x00</Id>
+      <CommandString>\x00</CommandString>
+      <ActionSequence>
+\x00
+      </ActionSequence>
+      <Async>true</Async>
+      <Enabled>true</Enabled>
+      <Category>\x00</Category>
+      <UseShortcut>false</UseShortcut>
+      <keyValue>0</keyValue>
+      <keyShift>0</keyShift>
+      <keyAlt>0</keyAlt>
+      <keyCtrl>0</keyCtrl>
+      <keyWin>0</keyWin>
+      <keyPassthru>true</keyPassthru>
+      <UseSpokenPhrase>true</UseSpokenPhrase>
+      <onlyKeyUp>false</onlyKeyUp>
+      <RepeatNumber>2</RepeatNumber>
+      <RepeatType>0</RepeatType>
+      <CommandType>0</CommandType>
+      <SourceProfile>00000000-0000-0000-0000-000000000000</SourceProfile>
+      <UseConfidence>false</UseConfidence>
+      <minimumConfidenceLevel>0</minimumConfidenceLevel>
+      <UseJoystick>false</UseJoystick>
+      <joystickNumber>0</joystickNumber>
+      <joystickButton>0</joystickButton>
+      <joystickNumber2>0</joystickNumber2>
+      <joystickButton2>0</joystickButton2>
+      <joystickUp>false</joystickUp>
+      <KeepRepeating>false</KeepRepeating>
+      <UseProcessOverride>false</UseProcessOverride>
+      <ProcessOverrideActiveWindow>true</ProcessOverrideActiveWindow>
+      <LostFocusStop>false</LostFocusStop>
+      <PauseLostFocus>false</PauseLostFocus>
+      <LostFocusBackCompat>true</LostFocusBackCompat>
+      <UseMouse>false</UseMouse>
+      <Mouse1>false</Mouse1>
+      <Mouse2>false</Mouse2>
+      <Mouse3>false</Mouse3>
+      <Mouse4>false</Mouse4>
+      <Mouse5>false</Mouse5>
+      <Mouse6>false</Mouse6>
+      <Mouse7>false</Mouse7>
+      <Mouse8>false</Mouse8>
+      <Mouse9>false</Mouse9>
+      <MouseUpOnly>false</MouseUpOnly>
+      <MousePassThru>true</MousePassThru>
+      <joystickExclusive>false</joystickExclusive>
+      <UseProfileProcessOverride>false</UseProfileProcessOverride>
+      <ProfileProcessOverrideActiveWindow>false</ProfileProcessOverrideActiveWindow>
+      <RepeatIfKeysDown>false</RepeatIfKeysDown>
+      <RepeatIfMouseDown>false</RepeatIfMouseDown>
+      <RepeatIfJoystickDown>false</RepeatIfJoystickDown>
+      <AH>0</AH>
+      <CL>0</CL>
+      <HasMB>false</HasMB>
+      <UseVariableHotkey>false</UseVariableHotkey>
+      <CLE>0</CLE>
+      <EX1>false</EX1>
+      <EX2>false</EX2>
+      <InternalId xsi:nil="true"/>
+      <HasInput>true</HasInput>
+    </Command>""".split("\x00")
+
+
 def command_xml(cmd):
     """Generate XML for a single command."""
     cmd_id = new_guid()
     base_id = new_guid()
     trigger_raw = cmd.get("trigger", "unnamed command")
-    trigger = escape(trigger_raw)
-    category = escape(cmd.get("category", "general"))
+    trigger = _escape(trigger_raw)
+    category = _escape(cmd.get("category", "general"))
 
     actions = cmd.get("actions", [])
     if not actions:
@@ -691,7 +866,9 @@ def command_xml(cmd):
             if isinstance(key, int) and not isinstance(key, bool):
                 pass  # raw VK code given as a JSON number - always valid
             elif not isinstance(key, str) or (
-                key.lower() not in KEY_CODES and not key.isdigit()
+                key not in KEY_CODES
+                and key.lower() not in KEY_CODES
+                and not key.isdigit()
             ):
                 warn(
                     f"Command '{trigger_raw}': unknown key '{key}' - command will have no action"
@@ -778,104 +955,36 @@ def command_xml(cmd):
 
     actions_xml = "\n".join(action_chunks)
 
-    return f"""    <Command>
-      <Referrer xsi:nil="true"/>
-      <ExecType>3</ExecType>
-      <Confidence>0</Confidence>
-      <PrefixActionCount>0</PrefixActionCount>
-      <IsDynamicallyCreated>false</IsDynamicallyCreated>
-      <TargetProcessSet>false</TargetProcessSet>
-      <TargetProcessType>0</TargetProcessType>
-      <TargetProcessLevel>0</TargetProcessLevel>
-      <CompareType>0</CompareType>
-      <ExecFromWildcard>false</ExecFromWildcard>
-      <IsSubCommand>false</IsSubCommand>
-      <IsOverride>false</IsOverride>
-      <BaseId>{base_id}</BaseId>
-      <OriginId>00000000-0000-0000-0000-000000000000</OriginId>
-      <SessionEnabled>true</SessionEnabled>
-      <Id>{cmd_id}</Id>
-      <CommandString>{trigger}</CommandString>
-      <ActionSequence>
-{actions_xml}
-      </ActionSequence>
-      <Async>true</Async>
-      <Enabled>true</Enabled>
-      <Category>{category}</Category>
-      <UseShortcut>false</UseShortcut>
-      <keyValue>0</keyValue>
-      <keyShift>0</keyShift>
-      <keyAlt>0</keyAlt>
-      <keyCtrl>0</keyCtrl>
-      <keyWin>0</keyWin>
-      <keyPassthru>true</keyPassthru>
-      <UseSpokenPhrase>true</UseSpokenPhrase>
-      <onlyKeyUp>false</onlyKeyUp>
-      <RepeatNumber>2</RepeatNumber>
-      <RepeatType>0</RepeatType>
-      <CommandType>0</CommandType>
-      <SourceProfile>00000000-0000-0000-0000-000000000000</SourceProfile>
-      <UseConfidence>false</UseConfidence>
-      <minimumConfidenceLevel>0</minimumConfidenceLevel>
-      <UseJoystick>false</UseJoystick>
-      <joystickNumber>0</joystickNumber>
-      <joystickButton>0</joystickButton>
-      <joystickNumber2>0</joystickNumber2>
-      <joystickButton2>0</joystickButton2>
-      <joystickUp>false</joystickUp>
-      <KeepRepeating>false</KeepRepeating>
-      <UseProcessOverride>false</UseProcessOverride>
-      <ProcessOverrideActiveWindow>true</ProcessOverrideActiveWindow>
-      <LostFocusStop>false</LostFocusStop>
-      <PauseLostFocus>false</PauseLostFocus>
-      <LostFocusBackCompat>true</LostFocusBackCompat>
-      <UseMouse>false</UseMouse>
-      <Mouse1>false</Mouse1>
-      <Mouse2>false</Mouse2>
-      <Mouse3>false</Mouse3>
-      <Mouse4>false</Mouse4>
-      <Mouse5>false</Mouse5>
-      <Mouse6>false</Mouse6>
-      <Mouse7>false</Mouse7>
-      <Mouse8>false</Mouse8>
-      <Mouse9>false</Mouse9>
-      <MouseUpOnly>false</MouseUpOnly>
-      <MousePassThru>true</MousePassThru>
-      <joystickExclusive>false</joystickExclusive>
-      <UseProfileProcessOverride>false</UseProfileProcessOverride>
-      <ProfileProcessOverrideActiveWindow>false</ProfileProcessOverrideActiveWindow>
-      <RepeatIfKeysDown>false</RepeatIfKeysDown>
-      <RepeatIfMouseDown>false</RepeatIfMouseDown>
-      <RepeatIfJoystickDown>false</RepeatIfJoystickDown>
-      <AH>0</AH>
-      <CL>0</CL>
-      <HasMB>false</HasMB>
-      <UseVariableHotkey>false</UseVariableHotkey>
-      <CLE>0</CLE>
-      <EX1>false</EX1>
-      <EX2>false</EX2>
-      <InternalId xsi:nil="true"/>
-      <HasInput>true</HasInput>
-    </Command>"""
+    p = _COMMAND_PARTS
+    return "".join((p[0], base_id, p[1], cmd_id, p[2], trigger,
+                    p[3], actions_xml, p[4], category, p[5]))
 
 
-def generate_profile(profile_data):
-    """Generate complete profile XML."""
+def iter_profile_xml(profile_data):
+    """Yield the profile XML as chunks: header, one chunk per command, footer.
+
+    Streaming form of generate_profile - main() writes chunks to the output file
+    as they render, so peak memory holds one command instead of the whole
+    profile. Joining the chunks is byte-identical to generate_profile's return.
+    """
     profile_id = profile_data.get("id", new_guid())
-    name = escape(profile_data.get("name", "Generated Profile"))
+    name = _escape(profile_data.get("name", "Generated Profile"))
     commands = profile_data.get("commands", [])
 
     # Filter out section markers (entries with _section key)
     commands = [c for c in commands if "_section" not in c]
 
-    commands_xml = "\n".join(command_xml(c) for c in commands)
-
-    return f"""<?xml version="1.0" encoding="utf-8"?>
+    yield f"""<?xml version="1.0" encoding="utf-8"?>
 <Profile xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">
   <Id>{profile_id}</Id>
   <Name>{name}</Name>
   <Commands>
-{commands_xml}
+"""
+    for i, c in enumerate(commands):
+        if i:
+            yield "\n"
+        yield command_xml(c)
+    yield """
   </Commands>
   <OverrideGlobal>false</OverrideGlobal>
   <GlobalHotkeyIndex>0</GlobalHotkeyIndex>
@@ -919,6 +1028,11 @@ def generate_profile(profile_data):
 </Profile>"""
 
 
+def generate_profile(profile_data):
+    """Generate complete profile XML."""
+    return "".join(iter_profile_xml(profile_data))
+
+
 def print_help():
     """Print usage information."""
     print("""VoiceAttack Profile Generator
@@ -1041,26 +1155,42 @@ def main():
         print(f"ERROR: Invalid JSON in {input_file}: {e}", file=sys.stderr)
         sys.exit(1)
 
+    # Section markers are authoring-only: strip them in one pass, shared by the
+    # command count below and the legacy emitter. iter_profile_xml keeps its own
+    # filter for direct in-process callers; it just sees an already-clean list.
+    commands = [c for c in profile_data.get("commands", []) if "_section" not in c]
+
     if legacy_emit:
+        profile_data["commands"] = commands
+        # Stream commands straight to disk instead of assembling the whole
+        # profile string first. Rendering goes to a temp file in the output
+        # directory that is only moved into place on success, preserving the
+        # hard-fail contract (exit 1, no output file) and the same
+        # symlink-safe temp-then-replace shape as gen2's fsout.
+        directory = os.path.dirname(os.path.abspath(output_file)) or "."
+        # Binary mode: encode each chunk once and skip the TextIOWrapper
+        # layer (and its platform newline translation) on the write path.
+        tmp = tempfile.NamedTemporaryFile(delete=False, dir=directory)
         try:
-            xml = generate_profile(profile_data)
+            with tmp:
+                for chunk in iter_profile_xml(profile_data):
+                    tmp.write(chunk.encode("utf-8"))
         except ConditionValidationError as e:
+            os.unlink(tmp.name)
             print(f"ERROR: {e}", file=sys.stderr)
             sys.exit(1)
+        except Exception:
+            os.unlink(tmp.name)
+            raise
+        os.replace(tmp.name, output_file)
         warning_count = len(_warnings)
     else:
         xml, warning_count = _run_gen2_pipeline(profile_data, no_idiom)
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(xml)
-
-    # Count actual commands (excluding section markers)
-    cmd_count = len(
-        [c for c in profile_data.get("commands", []) if "_section" not in c]
-    )
+        with open(output_file, "wb") as f:
+            f.write(xml.encode("utf-8"))
 
     print(f"Generated: {output_file}")
-    print(f"Commands: {cmd_count}")
+    print(f"Commands: {len(commands)}")
     if warning_count:
         print(f"Warnings: {warning_count}")
         sys.exit(2)